@@ -1,10 +1,53 @@
+import functools
 import json
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import chain, islice
 from pathlib import Path
-from typing import Dict, List, Tuple, Any
-
+from types import MappingProxyType
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
 import pandas as pd
 import pyreadstat
 
+try:  # optional fast JSON decoder; stdlib json is used when it is missing
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:  # optional incremental parser for large JSON arrays
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None
+
+try:  # optional schema-directed decoder for response records
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+try:  # optional Arrow storage for text columns
+    import pyarrow  # noqa: F401
+
+    TEXT_DTYPE = "string[pyarrow]"
+except ImportError:  # pragma: no cover
+    TEXT_DTYPE = "string"
+
 
 """
 Metadata-driven pipeline:
@@ -21,152 +64,728 @@ Metadata-driven pipeline:
 """
 
 
+# ----------------------------- JSON helpers ----------------------------- #
+
+@contextmanager
+def mapped_file(path: Path) -> Iterator[Union[memoryview, bytes]]:
+    """
+    Expose a file's bytes without reading them into a Python bytes object.
+
+    Yields a read-only memoryview over an mmap of the file, so orjson and
+    msgspec parse straight from the page cache. The view is only valid inside
+    the `with` block. Empty files cannot be mapped and are yielded as b"".
+    """
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            yield view
+
+
+def load_json_file(path: Path) -> Any:
+    """
+    Parse a JSON file, using orjson when installed and stdlib json otherwise.
+    """
+    if orjson is not None:
+        with mapped_file(path) as buf:
+            return orjson.loads(buf)
+
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def loads_json(raw: bytes) -> Any:
+    """
+    Parse a single JSON document from bytes (orjson when installed).
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# File suffixes that are always read as JSON lines, even with a single record
+JSON_LINES_SUFFIXES = (".jsonl", ".ndjson")
+
+
+def is_json_lines(path: Path, fh: BinaryIO) -> bool:
+    """
+    Tell a JSON-lines record stream apart from a single top-level object.
+
+    *.jsonl / *.ndjson files are JSON lines. Any other file only counts as
+    JSON lines if its first line is a complete JSON object and at least one
+    more line follows. `fh` is rewound before returning.
+    """
+    if path.suffix.lower() in JSON_LINES_SUFFIXES:
+        return True
+
+    lines = (line for line in fh if line.strip())
+    first = next(lines, b"")
+    has_more = next(lines, None) is not None
+    fh.seek(0)
+    if not has_more:
+        return False
+
+    try:
+        return isinstance(loads_json(first), dict)
+    except ValueError:
+        return False
+
+
+def first_json_byte(fh: BinaryIO, block_size: int = 64 * 1024) -> bytes:
+    """
+    Return the first non-whitespace byte of `fh`, or b"" if there is none.
+
+    Leading whitespace of any length is skipped block by block. `fh` is
+    rewound before returning.
+    """
+    first = b""
+    while block := fh.read(block_size):
+        head = block.lstrip(b" \t\r\n")
+        if head:
+            first = head[:1]
+            break
+    fh.seek(0)
+    return first
+
+
+def iter_json_records(path: Path, row_type: Optional[type] = None) -> Iterator[Any]:
+    """
+    Yield records one by one from either a JSON array or a JSON-lines file.
+
+    With a msgspec `row_type` (see make_row_type) records are decoded straight
+    into that Struct, one at a time, skipping keys it does not declare. JSON
+    arrays are first split into raw per-record slices of the memory-mapped
+    file, which are small compared with decoded records. Otherwise records are
+    dicts: JSON arrays are streamed with ijson when it is installed or parsed
+    in one go, and JSON-lines files are always read line by line. An empty or
+    all-whitespace file raises ValueError.
+    """
+    with open(path, "rb") as fh:
+        first = first_json_byte(fh)
+        if not first:
+            raise ValueError(f"{path.name} is empty.")
+
+        if first == b"[":
+            if row_type is not None:
+                decode_row = msgspec.json.Decoder(row_type).decode
+                with mapped_file(path) as buf:
+                    # Split the array into raw record slices of the mapping,
+                    # then decode them one by one so only the caller's current
+                    # batch of Structs is alive
+                    raws = msgspec.json.decode(buf, type=List[msgspec.Raw])
+                    try:
+                        for raw in raws:
+                            yield decode_row(raw)
+                    finally:
+                        # the slices must be gone before the mapping is closed
+                        raws = raw = None
+                return
+            if ijson is not None:
+                yield from ijson.items(fh, "item", use_float=True)
+                return
+            data = load_json_file(path)
+            if not isinstance(data, list):
+                raise ValueError(f"Expected {path.name} to contain a JSON array.")
+            yield from data
+            return
+
+        if not (first == b"{" and is_json_lines(path, fh)):
+            raise ValueError(
+                f"Expected {path.name} to contain a JSON array or JSON lines."
+            )
+
+        decode = msgspec.json.Decoder(row_type).decode if row_type is not None else loads_json
+        for line in fh:
+            if line.strip():
+                yield decode(line)
+
+
+def batched(records: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Group an iterable into lists of at most `size` items.
+    """
+    it = iter(records)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+        del chunk  # let the caller free the batch before the next one is built
+
+
 # ----------------------------- Schema helpers ----------------------------- #
 
+# Lower-cased schema fieldType → pandas dtype; anything else is text.
+# Int64 is nullable so missing values are supported, singleChoice fields are
+# categories since they hold a small fixed set of codes, and text is stored in
+# Arrow buffers when pyarrow is installed.
+FIELDTYPE_DTYPES: Dict[str, str] = {
+    "numeric": "Int64",
+    "singlechoice": "category",
+    "text": TEXT_DTYPE,
+    "datetime": "datetime64[ns]",
+}
+
+
 def map_fieldtype_to_dtype(field_type: str) -> str:
     """
-    Map schema fieldType to a pandas dtype string.
+    Map schema fieldType to a pandas dtype string (see FIELDTYPE_DTYPES).
+    """
+    return FIELDTYPE_DTYPES.get((field_type or "").lower(), TEXT_DTYPE)
 
-    Uses nullable integer (Int64) so missing values are supported.
+
+def freeze_json(value: Any) -> Any:
+    """
+    Return a read-only copy of decoded JSON: objects become MappingProxyType
+    views and arrays become tuples, recursively.
     """
-    ft = (field_type or "").lower()
-    if ft == "numeric":
-        return "Int64"
-    if ft in ("text", "singlechoice"):
-        return "string"
-    if ft == "datetime":
-        return "datetime64[ns]"
-    return "string"
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze_json(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze_json(v) for v in value)
+    return value
 
 
 def extract_schema_info(
     schema_path: Path,
-) -> Tuple[List[str], List[Dict[str, Any]], Dict[str, str], List[str]]:
+) -> Tuple[List[str], Sequence[Mapping[str, Any]], Dict[str, str], List[str]]:
     """
     Read responses_schema.json and return:
         - names: ordered list of all variable names (keys + fields)
-        - fields: list of field dicts
+        - fields: read-only field mappings (see freeze_json)
         - column_dtypes: {column_name: pandas_dtype} for non-datetime columns
         - datetime_columns: [column_name, ...]
+
+    Results are cached per resolved file path, keyed by its mtime and size,
+    so repeated runs in one process only re-parse the schema after it changes.
+    """
+    schema_path = Path(schema_path).resolve()
+    stat = schema_path.stat()
+    names, fields, column_dtypes, datetime_columns = _extract_schema_info_cached(
+        str(schema_path), stat.st_mtime_ns, stat.st_size
+    )
+    # The cached fields are frozen and shared as is; the small derived
+    # containers are copied so callers may modify them
+    return list(names), fields, dict(column_dtypes), list(datetime_columns)
+
+
+@functools.lru_cache(maxsize=32)
+def _extract_schema_info_cached(
+    schema_path: str,
+    mtime_ns: int,
+    size: int,
+) -> Tuple[List[str], Sequence[Mapping[str, Any]], Dict[str, str], List[str]]:
     """
-    with open(schema_path, "r", encoding="utf-8") as fh:
-        j = json.load(fh)
+    Uncached body of extract_schema_info; the stat values only key the cache.
+    """
+    j = load_json_file(Path(schema_path))
 
     schema = j.get("data", {}).get("schema") if isinstance(j, dict) else None
     if not isinstance(schema, dict):
         raise ValueError("Schema JSON must contain 'data.schema' as an object.")
 
     names: List[str] = []
-    fields: List[Dict[str, Any]] = []
+    fields: List[Dict[str, Any]] = schema.get("fields") or []
     column_dtypes_local: Dict[str, str] = {}
     datetime_cols_local: List[str] = []
 
-    # Keys (e.g. responseid)
-    for k in schema.get("keys", []) or []:
-        if not isinstance(k, dict):
-            continue
-        fname = k.get("name")
-        if not fname:
-            continue
-        names.append(fname)
-        pd_dtype = map_fieldtype_to_dtype(k.get("fieldType", "text") or "text")
-        if pd_dtype == "datetime64[ns]":
-            datetime_cols_local.append(fname)
-        else:
-            column_dtypes_local[fname] = pd_dtype
-
-    # Fields
-    fields = schema.get("fields") or []
-    for f in fields:
+    # Keys (e.g. responseid) first, then fields
+    for f in chain(schema.get("keys") or [], fields):
         if not isinstance(f, dict):
             continue
         fname = f.get("name")
         if not fname:
             continue
         names.append(fname)
-        ftype = f.get("fieldType", "text")
-        pd_dtype = map_fieldtype_to_dtype(ftype)
+        pd_dtype = map_fieldtype_to_dtype(f.get("fieldType") or "text")
         if pd_dtype == "datetime64[ns]":
             datetime_cols_local.append(fname)
         else:
             column_dtypes_local[fname] = pd_dtype
 
-    return names, fields, column_dtypes_local, datetime_cols_local
+    return names, freeze_json(fields), column_dtypes_local, datetime_cols_local
 
 
-def build_value_labels(fields: List[Dict[str, Any]]) -> Dict[str, Dict[Any, str]]:
+def build_value_labels(fields: Iterable[Mapping[str, Any]]) -> Dict[str, Dict[Any, str]]:
     """
     Build SPSS-style value labels from schema fields.
 
+    Codes are kept as they appear in the schema (usually strings); options
+    without a code and fields without any labelled option are skipped.
+
     Returns:
         {column_name: {code: label_text}}
     """
-    value_labels: Dict[str, Dict[Any, str]] = {}
+    return {
+        col_name: col_labels
+        for f in fields
+        if isinstance(f, Mapping)
+        and f.get("fieldType") == "singleChoice"
+        and (col_name := f.get("name"))
+        # template fields often carry no options: skip them before building a dict
+        and (options := f.get("options"))
+        if (
+            col_labels := {
+                code: (
+                    texts[0]["text"]
+                    if (texts := opt.get("texts")) and "text" in texts[0]
+                    else str(code)
+                )
+                for opt in options
+                if (code := opt.get("code")) is not None
+            }
+        )
+    }
 
-    for f in fields:
-        if not isinstance(f, dict):
-            continue
 
-        if f.get("fieldType") != "singleChoice":
-            continue
+# ----------------------------- Data helpers ----------------------------- #
 
-        col_name = f.get("name")
-        if not col_name:
-            continue
+def parse_datetime_column(values: pd.Series) -> pd.Series:
+    """
+    Parse a column of timestamps to UTC datetimes.
+
+    ISO-8601 strings go through pandas' vectorised format-directed parser;
+    only values it could not read are retried with per-value inference.
+    Non-text input (e.g. epoch numbers) is left to pd.to_datetime as is.
+    """
+    if not (
+        pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)
+    ) or pd.api.types.infer_dtype(values, skipna=True) != "string":
+        return pd.to_datetime(values, utc=True, errors="coerce")
+
+    parsed = pd.to_datetime(values, format="ISO8601", utc=True, errors="coerce")
 
-        options = f.get("options") or []
-        col_labels: Dict[Any, str] = {}
+    missed = parsed.isna() & values.notna()
+    if missed.any():
+        fallback = pd.to_datetime(values[missed], format="mixed", utc=True, errors="coerce")
+        # the fallback may pick a different resolution; align it before merging
+        parsed = parsed.where(~missed, fallback.astype(parsed.dtype))
 
-        for opt in options:
-            code_raw = opt.get("code")
-            code_val: Any = code_raw  # keep as string; your codes are often strings
+    return parsed
 
-            texts = opt.get("texts") or []
-            if texts:
-                label_text = texts[0].get("text", str(code_raw))
+
+def python_type_for_dtype(dtype: Optional[str]) -> Any:
+    """
+    Map a pandas dtype string to the type msgspec should decode a value as.
+
+    Only numeric columns are constrained; text-like columns accept any JSON
+    value because exports often store choice codes as bare numbers.
+    """
+    if dtype == "Int64":
+        return Union[int, float, None]
+    if dtype == "datetime64[ns]":
+        return Optional[str]
+    return Any
+
+
+def make_row_type(names: List[str], column_dtypes: Dict[str, str]) -> Optional[type]:
+    """
+    Build a msgspec Struct with one attribute per schema column.
+
+    Attributes are positional (f0, f1, ...) and renamed to the schema names,
+    so names that are not valid identifiers still work. Returns None when
+    msgspec is not installed.
+    """
+    if msgspec is None:
+        return None
+
+    attrs = [f"f{i}" for i in range(len(names))]
+    return msgspec.defstruct(
+        "Row",
+        [
+            (attr, python_type_for_dtype(column_dtypes.get(name, "datetime64[ns]")), None)
+            for attr, name in zip(attrs, names)
+        ],
+        rename=dict(zip(attrs, names)),
+    )
+
+
+def rows_to_frame(
+    rows: List[Any],
+    names: List[str],
+    object_columns: Iterable[str] = (),
+) -> pd.DataFrame:
+    """
+    Build a DataFrame with columns `names` from a batch of records.
+
+    Records are dicts or make_row_type Structs; dict keys not in `names` are
+    dropped and missing keys become missing values. Columns in
+    `object_columns` keep their Python objects rather than being inferred,
+    so integers with gaps are not widened to float64 (which rounds values
+    beyond 2**53) before apply_schema_dtypes builds their Int64 arrays.
+    """
+    if rows and not isinstance(rows[0], dict):
+        # Struct fields follow `names`, so their tuples line up with the columns
+        rows = list(map(msgspec.structs.astuple, rows))
+    df = pd.DataFrame(rows, columns=names, dtype=object)
+
+    keep = set(object_columns)
+    infer = [col for col in names if col not in keep]
+    if infer:
+        df[infer] = df[infer].infer_objects()
+    return df
+
+
+@functools.lru_cache(maxsize=None)
+def _int_parser() -> Optional[Callable[..., None]]:
+    """
+    Compile the integer-parsing kernel on first use; None without numba.
+
+    numba is optional and costly to import, so it is only loaded once a
+    column of integer strings actually needs parsing.
+    """
+    try:
+        import numba
+    except ImportError:  # pragma: no cover
+        return None
+
+    @numba.njit(cache=True, parallel=True)
+    def parse_int_bytes(buf, starts, ends, out, bad):
+        """
+        Parse buf[starts[i]:ends[i]] as a signed base-10 integer into out[i].
+
+        Sets bad[i] for empty, non-digit or over-long (> 18 digit) entries.
+        """
+        for i in numba.prange(len(out)):
+            j = starts[i]
+            end = ends[i]
+            neg = False
+            if j < end and (buf[j] == 45 or buf[j] == 43):  # '-' / '+'
+                neg = buf[j] == 45
+                j += 1
+            if j == end or end - j > 18:
+                bad[i] = True
+                continue
+            acc = 0
+            while j < end:
+                c = buf[j]
+                if c < 48 or c > 57:  # not '0'..'9'
+                    bad[i] = True
+                    break
+                acc = acc * 10 + (c - 48)
+                j += 1
+            out[i] = -acc if neg else acc
+
+    return parse_int_bytes
+
+
+def to_nullable_int(values: pd.Series) -> Optional[pd.Series]:
+    """
+    Build an Int64 column from Python ints and missing values in one pass.
+
+    Missing entries are zero-filled and the whole object array is cast to
+    int64 by numpy, then paired with the missing mask as an IntegerArray;
+    astype("Int64") would convert element by element instead. Returns None
+    if a value does not fit in int64.
+    """
+    obj = values.to_numpy(dtype=object)
+    mask = pd.isna(obj)
+    filled = obj.copy()
+    filled[mask] = 0
+    try:
+        data = filled.astype(np.int64)
+    except (OverflowError, TypeError, ValueError):
+        return None
+
+    return pd.Series(
+        pd.arrays.IntegerArray(data, mask),
+        index=values.index,
+        name=values.name,
+    )
+
+
+def parse_int_strings(values: pd.Series) -> Optional[pd.Series]:
+    """
+    Parse a column of integer strings to Int64 with a numba kernel.
+
+    The strings are joined into one newline-separated byte buffer and parsed
+    in parallel. Returns None when numba is missing or any non-null value is
+    not a plain integer, so the caller can fall back to pandas.
+    """
+    parse_int_bytes = _int_parser()
+    if parse_int_bytes is None:
+        return None
+
+    missing = values.isna().to_numpy()
+    texts = values.to_numpy(dtype=object)[~missing]
+    if len(texts) == 0:
+        return None
+
+    buf = np.frombuffer("\n".join(texts).encode("utf-8"), dtype=np.uint8)
+    seps = np.flatnonzero(buf == 10)
+    if len(seps) != len(texts) - 1:  # a value contained a newline itself
+        return None
+
+    starts = np.empty(len(texts), dtype=np.int64)
+    starts[0] = 0
+    starts[1:] = seps + 1
+    ends = np.empty(len(texts), dtype=np.int64)
+    ends[:-1] = seps
+    ends[-1] = len(buf)
+
+    out = np.zeros(len(texts), dtype=np.int64)
+    bad = np.zeros(len(texts), dtype=np.bool_)
+    parse_int_bytes(buf, starts, ends, out, bad)
+    if bad.any():
+        return None
+
+    data = np.zeros(len(values), dtype=np.int64)
+    data[~missing] = out
+    return pd.Series(
+        pd.arrays.IntegerArray(data, missing),
+        index=values.index,
+        name=values.name,
+    )
+
+
+def to_categorical(values: pd.Series, codes: Optional[Iterable[Any]] = None) -> pd.Series:
+    """
+    Convert choice values to a categorical of their string codes.
+
+    Categories start with the schema `codes` in schema order, so the category
+    codes are stable across files; values outside the schema are appended
+    rather than dropped. Integral floats (numeric codes widened to float64 by
+    a gap) are turned back into ints first so 1.0 maps to the code "1".
+    """
+    if pd.api.types.infer_dtype(values, skipna=True) in ("floating", "mixed-integer-float"):
+        values = pd.Series(
+            [int(v) if isinstance(v, float) and v.is_integer() else v for v in values],
+            index=values.index,
+            dtype=object,
+            name=values.name,
+        )
+    as_text = values.astype(TEXT_DTYPE)
+    categories = [str(code) for code in codes or []]
+    known = set(categories)
+    categories += [v for v in as_text.dropna().unique() if v not in known]
+
+    return pd.Series(
+        pd.Categorical(as_text, categories=categories),
+        index=values.index,
+        name=values.name,
+    )
+
+
+def run_column_jobs(
+    jobs: Dict[str, Callable[[], Optional[pd.Series]]],
+    max_workers: Optional[int] = None,
+) -> Dict[str, Optional[pd.Series]]:
+    """
+    Run independent per-column conversions and return {column: result}.
+
+    Jobs run on a thread pool of up to `max_workers` threads (default: up to
+    8, bounded by the CPU count) so conversions whose pandas/numpy kernels
+    release the GIL can overlap; with one worker they simply run in order.
+    """
+    if max_workers is None:
+        max_workers = min(8, os.cpu_count() or 1)
+    workers = min(max_workers, len(jobs))
+
+    if workers <= 1:
+        return {col: job() for col, job in jobs.items()}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {col: executor.submit(job) for col, job in jobs.items()}
+        return {col: future.result() for col, future in futures.items()}
+
+
+def apply_schema_dtypes(
+    df: pd.DataFrame,
+    column_dtypes: Dict[str, str],
+    datetime_columns: List[str],
+    value_labels: Optional[Dict[str, Dict[Any, str]]] = None,
+    max_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Apply schema-driven dtypes to `df`, skipping columns already typed.
+
+    Category columns take their categories from `value_labels` when given.
+    Conversions that need more than astype (categories, datetimes, Int64
+    columns left as objects) run per column via run_column_jobs.
+    """
+    value_labels = value_labels or {}
+
+    pending = {
+        col: dt
+        for col, dt in column_dtypes.items()
+        if col in df.columns
+        and dt != "datetime64[ns]"
+        and str(df[col].dtype) != str(pd.api.types.pandas_dtype(dt))
+    }
+
+    # Plain dtypes go through one astype call at the end
+    dtype_map = {col: dt for col, dt in pending.items() if dt != "category"}
+
+    jobs: Dict[str, Callable[[], Optional[pd.Series]]] = {}
+    converted: Dict[str, Optional[pd.Series]] = {}
+
+    for col, dt in pending.items():
+        if dt == "category":
+            jobs[col] = functools.partial(to_categorical, df[col], value_labels.get(col))
+        elif dt == "Int64" and not pd.api.types.is_numeric_dtype(df[col]):
+            # Int64 columns rows_to_frame left as objects: Python ints (exact
+            # even past 2**53), or integer codes exported as strings
+            kind = pd.api.types.infer_dtype(df[col], skipna=True)
+            if kind == "integer":
+                jobs[col] = functools.partial(to_nullable_int, df[col])
+            elif kind == "string":
+                # numba's default threading layer must not be entered from
+                # several threads at once, so this stays on the caller's thread
+                converted[col] = parse_int_strings(df[col])
             else:
-                label_text = str(code_raw)
+                # floats or mixed values: let astype try Int64 on real numbers
+                df[col] = df[col].infer_objects()
+
+    # Parse datetime columns
+    for col in datetime_columns:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            jobs[col] = functools.partial(parse_datetime_column, df[col])
 
-            col_labels[code_val] = label_text
+    converted.update(run_column_jobs(jobs, max_workers))
 
-        if col_labels:
-            value_labels[col_name] = col_labels
+    for col, values in converted.items():
+        if values is not None:
+            df[col] = values
+            dtype_map.pop(col, None)
 
-    return value_labels
+    if dtype_map:
+        df = df.astype(dtype_map, errors="ignore")
 
+    return df
+
+
+def load_typed_frames(
+    responses_data_path: Path,
+    names: List[str],
+    column_dtypes: Dict[str, str],
+    datetime_columns: List[str],
+    chunk_size: int,
+    row_type: Optional[type],
+    value_labels: Optional[Dict[str, Dict[Any, str]]] = None,
+) -> List[pd.DataFrame]:
+    """
+    Read records in batches of `chunk_size` and return one typed frame per batch.
+    """
+    int_columns = [col for col, dt in column_dtypes.items() if dt == "Int64"]
+    frames: List[pd.DataFrame] = []
+    for chunk in batched(iter_json_records(responses_data_path, row_type), chunk_size):
+        df_chunk = rows_to_frame(chunk, names, int_columns)
+        del chunk
+        frames.append(
+            apply_schema_dtypes(df_chunk, column_dtypes, datetime_columns, value_labels)
+        )
+    return frames
 
-# ----------------------------- Data helpers ----------------------------- #
 
 def load_responses_to_df(
     responses_data_path: Path,
     column_dtypes: Dict[str, str],
     datetime_columns: List[str],
+    chunk_size: int = 50_000,
+    schema_names: Optional[List[str]] = None,
+    value_labels: Optional[Dict[str, Dict[Any, str]]] = None,
 ) -> pd.DataFrame:
     """
     Load responses_data.json into a DataFrame and apply schema-driven dtypes.
+
+    Accepts a JSON array or JSON lines. Records are parsed and typed in
+    batches of `chunk_size`, so only one batch of decoded records is alive at
+    a time; the exception is a JSON array with neither msgspec nor ijson
+    installed, which is parsed whole first. Each batch is built with the
+    columns of `schema_names` (defaults to the typed columns followed by the
+    datetime columns; repeated names are kept once), so the frame comes out
+    in that column order without a reindexing copy.
+
+    With msgspec installed, records are decoded into a Struct generated from
+    the schema; if the data does not fit those types, plain dicts are used.
+
+    `value_labels` (see build_value_labels) fixes the categories of category
+    columns to the schema codes.
     """
     if not responses_data_path.exists():
         raise FileNotFoundError(f"Responses data file not found: {responses_data_path}")
 
-    with open(responses_data_path, "r", encoding="utf-8") as fh:
-        data = json.load(fh)
+    names = list(dict.fromkeys(schema_names or [*column_dtypes, *datetime_columns]))
+    row_type = make_row_type(names, column_dtypes)
+
+    frames: Optional[List[pd.DataFrame]] = None
+    if row_type is not None:
+        try:
+            frames = load_typed_frames(
+                responses_data_path, names, column_dtypes, datetime_columns,
+                chunk_size, row_type, value_labels,
+            )
+        except msgspec.ValidationError:
+            # Values that do not fit the schema types: redo it with plain dicts
+            frames = None
+    if frames is None:
+        frames = load_typed_frames(
+            responses_data_path, names, column_dtypes, datetime_columns,
+            chunk_size, None, value_labels,
+        )
+
+    if not frames:
+        return pd.DataFrame(columns=names)
+    if len(frames) == 1:
+        return frames[0]
+
+    # Batches that saw different off-schema choice values concat to object
+    df = pd.concat(frames, ignore_index=True)
+    return apply_schema_dtypes(df, column_dtypes, datetime_columns, value_labels)
+
+
+# ----------------------------- Export helpers ----------------------------- #
+
+def downcast_int_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrink Int64 columns to the smallest nullable integer type that fits.
+
+    SPSS stores every numeric as an 8-byte double, so the .sav is unchanged;
+    this only cuts the in-memory frame that is handed to the writer.
+    """
+    int_cols = [col for col in df.columns if str(df[col].dtype) == "Int64"]
+    if int_cols:
+        df[int_cols] = df[int_cols].apply(pd.to_numeric, downcast="integer")
+    return df
 
-    if not isinstance(data, list):
-        raise ValueError("Expected responses_data.json to contain a JSON array.")
 
-    df = pd.DataFrame(data)
+# SPSS stores datetimes as seconds since 1582-10-14 00:00:00
+SPSS_EPOCH_OFFSET_SECONDS = 12_219_379_200
 
-    # Apply non‑datetime dtypes
-    for col, dt in column_dtypes.items():
-        if col in df.columns and dt != "datetime64[ns]":
-            df[col] = df[col].astype(dt, errors="ignore")
 
-    # Parse datetime columns
-    for col in datetime_columns:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce")
+def write_responses_sav(
+    df: pd.DataFrame,
+    sav_output_path: Path,
+    value_labels: Dict[str, Dict[Any, str]],
+) -> None:
+    """
+    Write `df` to an SPSS .sav file with value labels.
 
-    return df
+    Datetime columns are converted to SPSS seconds up front and tagged with
+    the DATETIME format. pyreadstat would otherwise clone the whole frame to
+    do the same conversion, doubling peak memory during the write.
+    """
+    variable_format: Dict[str, str] = {}
+    converted: Dict[str, pd.Series] = {}
+
+    for col in df.columns:
+        values = df[col]
+        if not pd.api.types.is_datetime64_any_dtype(values):
+            continue
+        epoch = pd.Timestamp("1970-01-01", tz="UTC" if values.dt.tz is not None else None)
+        converted[col] = (values - epoch).dt.total_seconds() + SPSS_EPOCH_OFFSET_SECONDS
+        variable_format[col] = "DATETIME"
+
+    # Only the converted columns are new; the rest are shared with `df`
+    sav_df = df.assign(**converted) if converted else df
+
+    pyreadstat.write_sav(
+        sav_df,
+        sav_output_path,
+        variable_value_labels=value_labels,
+        variable_format=variable_format,
+    )
 
 
 # ----------------------------- Main pipeline ----------------------------- #
@@ -191,13 +810,16 @@ def main() -> None:
     print(f"Found {len(schema_names)} variables in schema.")
     print(f"{len(column_dtypes)} typed columns, {len(datetime_columns)} datetime columns.")
 
-    # 2) Data → DataFrame with types
-    df = load_responses_to_df(responses_data_path, column_dtypes, datetime_columns)
+    # 2) Data → DataFrame with types, columns already in schema order
+    df = load_responses_to_df(
+        responses_data_path,
+        column_dtypes,
+        datetime_columns,
+        schema_names=schema_names,
+        value_labels=value_labels,
+    )
 
-    # enforce schema column order
-    schema_order = [name for name in schema_names if name in df.columns]
-    if schema_order:
-        df = df[schema_order]
+    df = downcast_int_columns(df)
 
     # Quick validation prints
     print("DataFrame shape:", df.shape)
@@ -210,11 +832,7 @@ def main() -> None:
         print(df["status"].value_counts(dropna=False))
 
     # 3) DataFrame → SPSS .sav with value labels
-    pyreadstat.write_sav(
-        df,
-        sav_output_path,
-        variable_value_labels=value_labels,
-    )
+    write_responses_sav(df, sav_output_path, value_labels)
 
     print("Saved .sav to:", sav_output_path)
 
@@ -2,22 +2,33 @@ import json
 from pathlib import Path
 
 import pandas as pd
+import pyreadstat
+import pytest
 
+import pipeline
 from pipeline import (
+    TEXT_DTYPE,
+    apply_schema_dtypes,
+    downcast_int_columns,
     map_fieldtype_to_dtype,
     extract_schema_info,
     build_value_labels,
     load_responses_to_df,
+    parse_datetime_column,
+    parse_int_strings,
+    to_categorical,
+    to_nullable_int,
+    write_responses_sav,
 )
 
 
 def test_map_fieldtype_to_dtype():
     assert map_fieldtype_to_dtype("numeric") == "Int64"
-    assert map_fieldtype_to_dtype("text") == "string"
-    assert map_fieldtype_to_dtype("singleChoice") == "string"
+    assert map_fieldtype_to_dtype("text") == TEXT_DTYPE
+    assert map_fieldtype_to_dtype("singleChoice") == "category"
     assert map_fieldtype_to_dtype("dateTime") == "datetime64[ns]"
-    # unknown → string
-    assert map_fieldtype_to_dtype("unknown") == "string"
+    # unknown → text
+    assert map_fieldtype_to_dtype("unknown") == TEXT_DTYPE
 
 
 def test_build_value_labels():
@@ -52,6 +63,31 @@ def test_build_value_labels():
     assert "age" not in value_labels
 
 
+def test_build_value_labels_skips_empty_options_and_missing_codes():
+    fields = [
+        {"name": "template", "fieldType": "singleChoice"},
+        {"name": "empty", "fieldType": "singleChoice", "options": []},
+        {"name": "uncoded", "fieldType": "singleChoice", "options": [{"code": None}]},
+        {
+            "name": "channel",
+            "fieldType": "singleChoice",
+            "options": [
+                {"code": None, "texts": [{"text": "No code"}]},
+                {"code": 1, "texts": [{"text": "CAWI"}]},
+                {"code": 2},
+            ],
+        },
+    ]
+
+    value_labels = build_value_labels(fields)
+
+    # fields without options (or only code-less ones) get no labels at all
+    assert list(value_labels) == ["channel"]
+    # the code-less option is dropped; an option without text is labelled
+    # with its code
+    assert value_labels["channel"] == {1: "CAWI", 2: "2"}
+
+
 def test_extract_schema_info_and_load_responses(tmp_path: Path):
     """
     Integration-style test on a tiny synthetic schema + responses.
@@ -103,20 +139,330 @@ def test_extract_schema_info_and_load_responses(tmp_path: Path):
     assert names == ["responseid", "respid", "status", "interview_start"]
     assert column_dtypes["responseid"] == "Int64"
     assert column_dtypes["respid"] == "Int64"
-    assert column_dtypes["status"] == "string"
+    assert column_dtypes["status"] == "category"
     assert "interview_start" in datetime_columns
 
     # 4) Load responses and apply types
-    df = load_responses_to_df(data_path, column_dtypes, datetime_columns)
+    df = load_responses_to_df(data_path, column_dtypes, datetime_columns, schema_names=names)
 
-    # Shape
+    # Shape and schema column order
     assert df.shape == (2, 4)
+    assert list(df.columns) == names
 
     # Dtypes
     assert df["responseid"].dtype == "Int64"
     assert df["respid"].dtype == "Int64"
-    assert str(df["status"].dtype) == "string"
+    assert isinstance(df["status"].dtype, pd.CategoricalDtype)
     assert pd.api.types.is_datetime64_any_dtype(df["interview_start"])
 
     # Content sanity check
-    assert set(df["status"].unique()) == {"complete", "incomplete"}
\ No newline at end of file
+    assert set(df["status"].unique()) == {"complete", "incomplete"}
+
+
+def test_load_responses_json_lines_in_chunks(tmp_path: Path):
+    """
+    JSON-lines input read in batches smaller than the file still yields a
+    single frame with schema-driven dtypes, even if a batch lacks a column.
+    """
+    responses = [
+        {"respid": 10, "status": "complete", "interview_start": "2023-06-22T21:26:47+00:00"},
+        {"respid": 20, "status": "incomplete", "interview_start": "2023-06-23T10:00:00+00:00"},
+        {"respid": 30, "channel": 8},
+    ]
+    data_path = tmp_path / "responses_data.jsonl"
+    data_path.write_text("\n".join(json.dumps(r) for r in responses) + "\n", encoding="utf-8")
+
+    df = load_responses_to_df(
+        data_path,
+        {"respid": "Int64", "status": "category", "channel": "category"},
+        ["interview_start"],
+        chunk_size=2,
+        value_labels={"status": {"complete": "Complete"}, "channel": {"1": "CAWI"}},
+    )
+
+    assert df.shape == (3, 4)
+    assert df["respid"].tolist() == [10, 20, 30]
+    assert list(df["status"].cat.categories) == ["complete", "incomplete"]
+    assert df["status"].isna().tolist() == [False, False, True]
+    # numeric choice codes line up with the schema's string codes
+    assert list(df["channel"].cat.categories) == ["1", "8"]
+    assert df["channel"].tolist()[2] == "8"
+    assert pd.api.types.is_datetime64_any_dtype(df["interview_start"])
+
+
+def test_to_categorical_numeric_codes_with_gap():
+    """
+    Numeric choice codes widened to float64 by a missing value still match
+    the schema's string codes instead of becoming "1.0".
+    """
+    channel = pd.Series([1, None, 2], dtype="float64", name="channel")
+
+    result = to_categorical(channel, ["1", "2"])
+
+    assert list(result.cat.categories) == ["1", "2"]
+    assert result.tolist()[0] == "1" and result.tolist()[2] == "2"
+    assert result.isna().tolist() == [False, True, False]
+    assert result.name == "channel"
+
+
+def test_apply_schema_dtypes_threaded_matches_inline():
+    """
+    Converting columns on a thread pool gives the same frame as running the
+    conversions one after another.
+    """
+    def make_frame():
+        return pd.DataFrame(
+            {
+                "respid": [10, None, 2**60 + 1],
+                "code": ["7", None, "-3"],
+                "status": ["complete", "incomplete", None],
+                "channel": [1, 8, None],
+                "note": ["a", None, "c"],
+                "interview_start": ["2023-06-22T21:26:47+00:00", None, "June 5 2023"],
+            },
+            dtype=object,
+        )
+
+    column_dtypes = {
+        "respid": "Int64",
+        "code": "Int64",
+        "status": "category",
+        "channel": "category",
+        "note": TEXT_DTYPE,
+    }
+    value_labels = {"status": {"complete": "Complete"}, "channel": {"1": "CAWI"}}
+
+    args = (column_dtypes, ["interview_start"], value_labels)
+    inline = apply_schema_dtypes(make_frame(), *args, max_workers=1)
+    threaded = apply_schema_dtypes(make_frame(), *args, max_workers=4)
+
+    pd.testing.assert_frame_equal(threaded, inline)
+    assert str(threaded["respid"].dtype) == "Int64"
+    assert list(threaded["channel"].cat.categories) == ["1", "8"]
+    assert pd.api.types.is_datetime64_any_dtype(threaded["interview_start"])
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        json.dumps({"respid": 10}),
+        json.dumps({"respid": 10}, indent=2),
+    ],
+)
+def test_load_responses_rejects_single_object(tmp_path: Path, content: str):
+    data_path = tmp_path / "responses_data.json"
+    data_path.write_text(content, encoding="utf-8")
+
+    with pytest.raises(ValueError, match="JSON array"):
+        load_responses_to_df(data_path, {"respid": "Int64"}, [])
+
+
+def test_load_responses_array_after_long_leading_whitespace(tmp_path: Path):
+    data_path = tmp_path / "responses_data.json"
+    data_path.write_text("\n" * 100 + json.dumps([{"respid": 1}]), encoding="utf-8")
+
+    df = load_responses_to_df(data_path, {"respid": "Int64"}, [])
+
+    assert df["respid"].tolist() == [1]
+
+
+@pytest.mark.parametrize("content", ["", " \n\t\r\n" * 20])
+def test_load_responses_rejects_empty_file(tmp_path: Path, content: str):
+    data_path = tmp_path / "responses_data.json"
+    data_path.write_text(content, encoding="utf-8")
+
+    with pytest.raises(ValueError, match="is empty"):
+        load_responses_to_df(data_path, {"respid": "Int64"}, [])
+
+
+def test_parse_datetime_column_falls_back_for_non_iso_values():
+    values = pd.Series(
+        ["2023-06-22T21:26:47.597+00:00", "June 5 2023 10:00", None, "garbage"],
+        dtype=object,
+    )
+
+    parsed = parse_datetime_column(values)
+
+    assert str(parsed.dt.tz) == "UTC"
+    assert parsed[0] == pd.Timestamp("2023-06-22 21:26:47.597", tz="UTC")
+    assert parsed[1] == pd.Timestamp("2023-06-05 10:00", tz="UTC")
+    assert parsed[2:].isna().all()
+
+
+def test_load_responses_numeric_datetime_with_gap(tmp_path: Path):
+    data_path = tmp_path / "responses_data.json"
+    data_path.write_text(json.dumps([{"t": 1687469207}, {"t": None}]), encoding="utf-8")
+
+    df = load_responses_to_df(data_path, {}, ["t"])
+
+    assert pd.api.types.is_datetime64_any_dtype(df["t"])
+    assert df["t"].notna().tolist() == [True, False]
+
+
+def test_load_responses_large_int_with_gap_keeps_exact_value(tmp_path: Path):
+    big = 2**60 + 1  # not representable as float64
+    data_path = tmp_path / "responses_data.json"
+    data_path.write_text(
+        json.dumps([{"respid": big}, {"respid": None}, {"respid": 3}]), encoding="utf-8"
+    )
+
+    df = load_responses_to_df(data_path, {"respid": "Int64"}, [])
+
+    assert str(df["respid"].dtype) == "Int64"
+    assert df["respid"].tolist() == [big, pd.NA, 3]
+
+
+def test_load_responses_values_outside_schema_types(tmp_path: Path):
+    """
+    A numeric column holding text (and a key not in the schema) still loads;
+    the column is left untyped rather than failing the whole file.
+    """
+    responses = [
+        {"respid": 10, "note": "x", "extra": 1},
+        {"respid": "n/a", "note": "y"},
+    ]
+    data_path = tmp_path / "responses_data.json"
+    data_path.write_text(json.dumps(responses), encoding="utf-8")
+
+    df = load_responses_to_df(
+        data_path,
+        {"respid": "Int64", "note": "string"},
+        [],
+        schema_names=["respid", "note", "respid"],
+    )
+
+    assert list(df.columns) == ["respid", "note"]
+    assert df["respid"].tolist() == [10, "n/a"]
+    assert df["note"].tolist() == ["x", "y"]
+
+
+def test_extract_schema_info_reloads_changed_file(tmp_path: Path, monkeypatch):
+    """
+    The cached schema is reused for an unchanged file and re-read once the
+    file changes on disk.
+    """
+    def write_schema(fields):
+        schema = {"data": {"schema": {"keys": [], "fields": fields}}}
+        schema_path.write_text(json.dumps(schema), encoding="utf-8")
+
+    schema_path = tmp_path / "responses_schema.json"
+    write_schema([{"name": "respid", "fieldType": "numeric", "options": []}])
+
+    names, fields, column_dtypes, _ = extract_schema_info(schema_path)
+    names.append("mutated")
+    column_dtypes["mutated"] = "string"
+    # the shared field mappings are read-only all the way down
+    with pytest.raises(TypeError):
+        fields[0]["fieldType"] = "text"
+    with pytest.raises(AttributeError):
+        fields[0]["options"].append({"code": "1"})
+
+    assert extract_schema_info(schema_path)[0] == ["respid"]
+    assert extract_schema_info(schema_path)[2] == {"respid": "Int64"}
+
+    # A relative spelling of the same file resolves to the same cache entry
+    monkeypatch.chdir(tmp_path)
+    assert extract_schema_info(Path(schema_path.name))[0] == ["respid"]
+
+    write_schema([
+        {"name": "respid", "fieldType": "numeric"},
+        {"name": "status", "fieldType": "singleChoice"},
+    ])
+
+    assert extract_schema_info(schema_path)[0] == ["respid", "status"]
+
+
+def test_extract_schema_info_cache_hit_skips_parsing(tmp_path: Path, monkeypatch):
+    """
+    A cache hit neither re-reads the file nor copies the field mappings, so it
+    is never more work than a fresh parse.
+    """
+    fields = [
+        {"name": f"q{i}", "fieldType": "singleChoice", "options": [{"code": "1"}]}
+        for i in range(50)
+    ]
+    schema_path = tmp_path / "responses_schema.json"
+    schema_path.write_text(
+        json.dumps({"data": {"schema": {"keys": [], "fields": fields}}}), encoding="utf-8"
+    )
+
+    loads = []
+    load_json_file = pipeline.load_json_file
+    monkeypatch.setattr(
+        pipeline, "load_json_file", lambda path: loads.append(path) or load_json_file(path)
+    )
+
+    first = extract_schema_info(schema_path)
+    hit = extract_schema_info(schema_path)
+
+    assert len(loads) == 1
+    assert hit[1] is first[1]
+    assert hit[0] == first[0] and hit[0] is not first[0]
+
+
+def test_parse_int_strings():
+    pytest.importorskip("numba")
+
+    parsed = parse_int_strings(pd.Series(["10", None, "-3", "+7"], dtype=object))
+    assert str(parsed.dtype) == "Int64"
+    assert parsed.tolist() == [10, pd.NA, -3, 7]
+
+    # anything that is not a plain integer is left to pandas
+    assert parse_int_strings(pd.Series(["1", "2.5"], dtype=object)) is None
+    assert parse_int_strings(pd.Series(["1", ""], dtype=object)) is None
+
+
+def test_to_nullable_int():
+    big = 2**60 + 1  # not representable as float64
+    parsed = to_nullable_int(pd.Series([big, None, -3], dtype=object))
+    assert str(parsed.dtype) == "Int64"
+    assert parsed.tolist() == [big, pd.NA, -3]
+
+    assert to_nullable_int(pd.Series([2**70, None], dtype=object)) is None
+
+
+def test_downcast_int_columns():
+    df = pd.DataFrame(
+        {
+            "code": pd.array([1, None, 8], dtype="Int64"),
+            "respid": pd.array([8035, 8038, None], dtype="Int64"),
+            "note": pd.array(["a", "b", "c"], dtype="string"),
+        }
+    )
+
+    df = downcast_int_columns(df)
+
+    assert str(df["code"].dtype) == "Int8"
+    assert str(df["respid"].dtype) == "Int16"
+    assert df["respid"].tolist() == [8035, 8038, pd.NA]
+    assert str(df["note"].dtype) == "string"
+
+
+def test_write_responses_sav_round_trip(tmp_path: Path):
+    """
+    Datetimes converted to SPSS seconds before the write read back unchanged,
+    alongside labelled choice codes.
+    """
+    df = pd.DataFrame(
+        {
+            "respid": pd.array([10, None], dtype="Int64"),
+            "status": pd.Categorical(["complete", "incomplete"]),
+            "interview_start": pd.to_datetime(
+                ["2023-06-22T21:26:47.5+00:00", None], format="ISO8601", utc=True
+            ),
+        }
+    )
+    value_labels = {"status": {"complete": "Complete", "incomplete": "Incomplete"}}
+    sav_path = tmp_path / "responses_data.sav"
+
+    write_responses_sav(df, sav_path, value_labels)
+    out, meta = pyreadstat.read_sav(str(sav_path))
+
+    assert out["respid"].tolist()[0] == 10
+    assert out["status"].tolist() == ["complete", "incomplete"]
+    assert out["interview_start"][0] == pd.Timestamp("2023-06-22 21:26:47.5")
+    assert pd.isna(out["interview_start"][1])
+    assert meta.original_variable_types["interview_start"].startswith("DATETIME")
+    assert meta.variable_value_labels["status"] == value_labels["status"]
+    # the caller's frame keeps its datetimes
+    assert pd.api.types.is_datetime64_any_dtype(df["interview_start"])